@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-15 21:15
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_notification_related_message_portfolioitem'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='skill_name_ci'),
+        ),
+    ]
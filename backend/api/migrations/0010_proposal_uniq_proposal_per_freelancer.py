@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-15 21:18
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def delete_duplicate_proposals(apps, schema_editor):
+    """ Keep one proposal per (project, freelancer) so the constraint can be added: the accepted one if any, else the earliest. """
+    Proposal = apps.get_model('api', 'Proposal')
+    duplicated = (
+        Proposal.objects.values('project_id', 'freelancer_id')
+        .annotate(n=Count('id')).filter(n__gt=1)
+    )
+    for pair in duplicated:
+        rows = Proposal.objects.filter(project_id=pair['project_id'], freelancer_id=pair['freelancer_id'])
+        keep = rows.filter(status='accepted').order_by('id').first() or rows.order_by('id').first()
+        rows.exclude(pk=keep.pk).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_skill_name_ci'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_proposals, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='proposal',
+            constraint=models.UniqueConstraint(fields=('project', 'freelancer'), name='uniq_proposal_per_freelancer'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-15 21:21
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def delete_duplicate_reviews(apps, schema_editor):
+    """ Keep the earliest review per (project, reviewer, reviewee) so the constraint can be added. """
+    Review = apps.get_model('api', 'Review')
+    duplicated = (
+        Review.objects.values('project_id', 'reviewer_id', 'reviewee_id')
+        .annotate(n=Count('id')).filter(n__gt=1)
+    )
+    for key in duplicated:
+        rows = Review.objects.filter(
+            project_id=key['project_id'], reviewer_id=key['reviewer_id'], reviewee_id=key['reviewee_id']
+        )
+        rows.exclude(pk=rows.order_by('id').first().pk).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_message_timestamp_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_reviews, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(fields=('project', 'reviewer', 'reviewee'), name='uniq_review'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-15 21:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_review_uniq_review'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'read'], name='notification_recipient_read'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-15 21:28
+
+from django.db import migrations, models
+
+
+def backfill_skills_text(apps, schema_editor):
+    Project = apps.get_model('api', 'Project')
+    for project in Project.objects.prefetch_related('skills_required').only('id'):
+        names = sorted(skill.name for skill in project.skills_required.all())
+        Project.objects.filter(pk=project.pk).update(skills_text=' '.join(names))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_notification_recipient_read'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='skills_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(backfill_skills_text, migrations.RunPython.noop),
+    ]
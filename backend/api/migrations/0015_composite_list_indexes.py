@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-15 21:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_project_skills_text'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', '-timestamp'], name='notification_recipient_ts'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['client', '-created_at'], name='project_client_created'),
+        ),
+        migrations.AddIndex(
+            model_name='proposal',
+            index=models.Index(fields=['freelancer', '-submitted_at'], name='proposal_freelancer_submitted'),
+        ),
+        migrations.AddIndex(
+            model_name='proposal',
+            index=models.Index(fields=['project', 'status'], name='proposal_project_status'),
+        ),
+    ]
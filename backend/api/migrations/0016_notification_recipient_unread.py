@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-15 21:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_composite_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('read', False)), fields=['recipient'], name='notification_recipient_unread'),
+        ),
+    ]
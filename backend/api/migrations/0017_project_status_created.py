@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-15 21:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_notification_recipient_unread'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['status', '-created_at'], name='project_status_created'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_notification_updated_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notification_recipient_read',
+        ),
+    ]
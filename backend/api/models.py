@@ -2,12 +2,19 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.conf import settings
-from django.db.models.signals import post_save, pre_save # Import signals
+from django.db.models.signals import post_save, pre_save, pre_delete, post_delete, m2m_changed # Import signals
 from django.dispatch import receiver # Import receiver decorator
 from django.dispatch import receiver # Import receiver decorator
 import django.utils.timezone
 from django.core.mail import send_mail # Import Django's email function
 from django.template.loader import render_to_string
+from django.db.models.functions import Lower
+from django.db import transaction
+from django.core.cache import cache
+import logging
+import functools
+
+logger = logging.getLogger(__name__)
 
 # This is a custom User model that extends Django's default.
 class User(AbstractUser):
@@ -15,6 +22,12 @@ class User(AbstractUser):
 
 class Skill(models.Model):
     name = models.CharField(max_length=100, unique=True)
+    # Every add/rename moves Max(updated_at); the skill endpoints' ETag is built from it
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Case-insensitive lookups (Lower('name')) when resolving skill names
+        indexes = [models.Index(Lower('name'), name='skill_name_ci')]
 
     def __str__(self):
         return self.name
@@ -69,6 +82,17 @@ class Project(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='open')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized, space-separated skill names kept in sync by the m2m_changed receiver
+    # below; lets text search match skills without joining through skills_required
+    skills_text = models.TextField(blank=True, default='', editable=False)
+
+    class Meta:
+        indexes = [
+            # A client's project list: filter by client, newest first
+            models.Index(fields=['client', '-created_at'], name='project_client_created'),
+            # The open-project browse list: filter by status, newest first
+            models.Index(fields=['status', '-created_at'], name='project_status_created'),
+        ]
 
     def __str__(self):
         return self.title
@@ -90,6 +114,18 @@ class Proposal(models.Model):
     # Store the previous status to detect changes
     _original_status = None
 
+    class Meta:
+        constraints = [
+            # One proposal per freelancer per project, enforced by the INSERT itself
+            models.UniqueConstraint(fields=['project', 'freelancer'], name='uniq_proposal_per_freelancer'),
+        ]
+        indexes = [
+            # A freelancer's proposal list, newest first
+            models.Index(fields=['freelancer', '-submitted_at'], name='proposal_freelancer_submitted'),
+            # Pending siblings rejected when a proposal is accepted
+            models.Index(fields=['project', 'status'], name='proposal_project_status'),
+        ]
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._original_status = self.status
@@ -114,6 +150,13 @@ class Message(models.Model):
     content = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Each side of the inbox OR filter becomes an index range already in cursor order
+        indexes = [
+            models.Index(fields=['sender', '-timestamp'], name='message_sender_ts'),
+            models.Index(fields=['receiver', '-timestamp'], name='message_receiver_ts'),
+        ]
+
     def __str__(self):
         return f"From {self.sender.username} to {self.receiver.username}"
 
@@ -125,6 +168,12 @@ class Review(models.Model):
     comment = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            # One review per reviewer -> reviewee per project, enforced by the INSERT itself
+            models.UniqueConstraint(fields=['project', 'reviewer', 'reviewee'], name='uniq_review'),
+        ]
+
     def __str__(self):
         return f"Review for {self.project.title}"
 
@@ -133,6 +182,8 @@ class Notification(models.Model):
     message = models.TextField()
     read = models.BooleanField(default=False)
     timestamp = models.DateTimeField(auto_now_add=True) # Changed from default=now
+    # Moves on every read/unread change (queryset updates set it explicitly); part of the feed ETag
+    updated_at = models.DateTimeField(auto_now=True)
     # Link notification to relevant objects
     project = models.ForeignKey(Project, on_delete=models.CASCADE, null=True, blank=True, related_name='notifications')
     proposal = models.ForeignKey(Proposal, on_delete=models.CASCADE, null=True, blank=True, related_name='notifications')
@@ -141,16 +192,45 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            # Partial index over unread rows only: stays small however many notifications are
+            # read, and backs the mark-all-read UPDATE and unread counts
+            models.Index(fields=['recipient'], condition=models.Q(read=False), name='notification_recipient_unread'),
+            # The cursor-paginated feed: filter by recipient, newest first
+            models.Index(fields=['recipient', '-timestamp'], name='notification_recipient_ts'),
+        ]
 
     def __str__(self):
         return f"Notification for {self.recipient.username}: {self.message[:30]}"
 
 
+# --- Cached per-user unread notification counts ---
+# The count is always recomputed from the database on a miss and never adjusted in place:
+# with a per-process cache, other workers only see a write once their short TTL expires
+UNREAD_COUNT_CACHE_TIMEOUT = 30 # seconds
+
+
+def unread_count_cache_key(user_id):
+    return f'api:notifications:unread:{user_id}'
+
+
+def invalidate_unread_count(user_id):
+    """ Drop a user's cached unread count once the surrounding transaction commits. """
+    transaction.on_commit(lambda: cache.delete(unread_count_cache_key(user_id)))
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def invalidate_notification_unread_count(sender, instance, **kwargs):
+    # Any saved or deleted row may flip the count (e.g. a PATCH of `read` on the detail endpoint)
+    invalidate_unread_count(instance.recipient_id)
+
+
 # --- Utility function to send email (placeholder) ---
 def send_notification_email(recipient_email, subject, message_text, message_html=None):
     """Sends an email notification."""
     if not recipient_email:
-        print(f"Skipping email for notification '{subject}': Recipient has no email address.")
+        logger.info("Skipping email for notification '%s': Recipient has no email address.", subject)
         return
     try:
         send_mail(
@@ -161,20 +241,71 @@ def send_notification_email(recipient_email, subject, message_text, message_html
             html_message=message_html, # Optional HTML version
             fail_silently=False, # Set to True in production if you don't want errors to stop execution
         )
-        print(f"Email notification '{subject}' sent/printed for {recipient_email}")
-    except Exception as e:
-        # Log the error in a real application
-        print(f"Error sending email notification '{subject}' to {recipient_email}: {e}")
+        logger.info("Email notification '%s' sent/printed for %s", subject, recipient_email)
+    except Exception:
+        # Traceback goes to the configured handlers instead of stdout
+        logger.exception("Error sending email notification '%s' to %s", subject, recipient_email)
+
+# --- Denormalized project skill names ---
+
+def refresh_project_skills_text(project_ids):
+    """ Recompute Project.skills_text for the given projects (UPDATE only, no save() signals). """
+    now = django.utils.timezone.now()
+    for project_id in set(project_ids):
+        names = Skill.objects.filter(project=project_id).order_by('name').values_list('name', flat=True)
+        # The rendered skills changed too, so bump updated_at (conditional GETs key on it)
+        Project.objects.filter(pk=project_id).update(skills_text=' '.join(names), updated_at=now)
+
+
+@receiver(m2m_changed, sender=Project.skills_required.through)
+def sync_project_skills_text(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # project.skills_required.add/remove/set/clear(): only this project changes
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            refresh_project_skills_text([instance.pk])
+    elif action == 'pre_clear':
+        # skill.project_set.clear(): remember the projects before the rows are gone
+        instance._skills_text_project_ids = list(instance.project_set.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        refresh_project_skills_text(getattr(instance, '_skills_text_project_ids', ()))
+    elif action in ('post_add', 'post_remove'):
+        refresh_project_skills_text(pk_set or ())
+
+
+@receiver(post_save, sender=Skill)
+def sync_renamed_skill_text(sender, instance, created, **kwargs):
+    if not created: # A new skill is on no project yet
+        refresh_project_skills_text(instance.project_set.values_list('pk', flat=True))
+
+
+# Deleting a skill cascades its through rows without m2m_changed: remember the projects
+# before the rows are gone, then refresh them once the delete has run
+@receiver(pre_delete, sender=Skill)
+def capture_deleted_skill_projects(sender, instance, **kwargs):
+    instance._skills_text_project_ids = list(instance.project_set.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Skill)
+def sync_deleted_skill_text(sender, instance, **kwargs):
+    refresh_project_skills_text(getattr(instance, '_skills_text_project_ids', ()))
+
 
 # --- Signals for Notifications ---
 
+def proposal_rejected_message(project_title):
+    """ In-app/email text sent to a freelancer whose proposal was rejected. """
+    return f"Regarding your proposal for '{project_title}', the client has chosen another direction. Thank you for your interest."
+
 # Use pre_save to capture the state *before* saving
 @receiver(pre_save, sender=Proposal)
 def capture_proposal_original_status(sender, instance, **kwargs):
-    # ... (this function remains the same) ...
+    # Instances loaded from the database already recorded their status in __init__
+    # (and post_save refreshes it), so only unsaved/hand-built instances need a lookup
+    if not instance._state.adding:
+        return
     try:
         if instance.pk:
-            original_instance = sender.objects.get(pk=instance.pk)
+            original_instance = sender.objects.only('status').get(pk=instance.pk)
             instance._original_status = original_instance.status
         else:
             instance._original_status = 'pending' # Default for new proposals
@@ -199,7 +330,7 @@ def create_proposal_status_notification(sender, instance, created, **kwargs):
             send_email_flag = True
         elif instance.status == 'rejected':
             subject = f"Proposal Update: {project_title}"
-            message = f"Regarding your proposal for '{project_title}', the client has chosen another direction. Thank you for your interest."
+            message = proposal_rejected_message(project_title)
             send_email_flag = True
 
     # Notify the client when a *new* proposal is submitted
@@ -219,13 +350,17 @@ def create_proposal_status_notification(sender, instance, created, **kwargs):
             project=instance.project,
             proposal=instance
         )
-        # Also send the email notification
-        send_notification_email(
+        # Also send the email notification, once the status change has committed
+        transaction.on_commit(functools.partial(
+            send_notification_email,
             recipient_email=recipient.email,
             subject=subject,
             message_text=message # Use the same message for plain text email
             # message_html=render_to_string('emails/notification_template.html', {'message': message}) # Optional: use a template
-        )
+        ))
+
+    # The saved status is the baseline for the next save of this instance
+    instance._original_status = instance.status
 
 
 @receiver(post_save, sender=Message)
@@ -242,10 +377,11 @@ def create_message_notification(sender, instance, created, **kwargs):
             message=message,
             related_message=instance # Link the notification to the message
         )
-        # Also send the email notification
-        send_notification_email(
+        # Also send the email notification, once the message has committed
+        transaction.on_commit(functools.partial(
+            send_notification_email,
             recipient_email=recipient.email,
             subject=subject,
             message_text=message
             # message_html=render_to_string(...) # Optional HTML version
-        )
\ No newline at end of file
+        ))
\ No newline at end of file
@@ -0,0 +1,29 @@
+# backend/api/pagination.py
+from rest_framework.pagination import CursorPagination
+
+
+class TimestampCursorPagination(CursorPagination):
+    """
+    Keyset pagination for timestamp-ordered feeds (messages, notifications).
+    Each page is an indexed range scan instead of an OFFSET skip over older rows.
+    """
+    ordering = '-timestamp'
+    page_size = 50
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination for lists ordered newest first (projects, reviews).
+    Unlike page-number pagination it issues no COUNT(*) per request.
+    """
+    ordering = '-created_at'
+
+
+class SubmittedAtCursorPagination(CursorPagination):
+    """ Keyset pagination for proposals, newest first. """
+    ordering = '-submitted_at'
+
+
+class StartDateCursorPagination(CursorPagination):
+    """ Keyset pagination for contracts, most recently started first. """
+    ordering = '-start_date'
@@ -0,0 +1,27 @@
+# backend/api/renderers.py
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError: # orjson is optional; fall back to the stdlib-based renderer
+    orjson = None
+
+
+class OrjsonRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+    orjson emits bytes directly and is several times faster than the stdlib
+    encoder on large list responses. Types it does not know natively
+    (Decimal, lazy strings, ...) go through DRF's JSONEncoder.default.
+    """
+    _fallback_encoder = encoders.JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            # Pretty-printed output keeps DRF's exact formatting
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        # DRF keys ListField/many-related errors by int index; the stdlib encoder stringifies those keys
+        return orjson.dumps(data, default=self._fallback_encoder.default, option=orjson.OPT_NON_STR_KEYS)
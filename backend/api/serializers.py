@@ -7,17 +7,97 @@ from .models import (
 )
 # Import the function to get the currently active User model
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import F, Prefetch
+from django.db.models.functions import Lower
+import datetime
 
 # Get the User model defined in settings (likely 'api.User')
 User = get_user_model()
 
 
+# Serializers on hot read paths (nested users and skills, project/proposal lists, polled
+# notifications) override to_representation() to build their dict directly instead of
+# iterating bound fields. That dict defines the output; Meta.fields and any declared
+# fields only drive validation on writes.
+
+def _iso_utc(value):
+    """ Render a datetime as ISO 8601 UTC with DRF's 'Z' suffix (e.g. '2025-01-01T12:00:00.123456Z'). """
+    if not value:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    elif value.utcoffset():
+        value = value.astimezone(datetime.timezone.utc)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def _decimal_str(value, places=2):
+    """ Render a Decimal as DRF's DecimalField does (coerced to a fixed-places string). """
+    if value is None:
+        return None
+    return format(value, '.%df' % places)
+
+
+class FastDateTimeField(serializers.DateTimeField):
+    """
+    DateTimeField that renders timestamps as ISO 8601 UTC directly, skipping DRF's
+    per-value timezone activation and format resolution. Output matches the default
+    field while TIME_ZONE is 'UTC'.
+    """
+    def to_representation(self, value):
+        return _iso_utc(value)
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField whose many=True form resolves every id with a single
+    pk__in query instead of one SELECT per id. Behaves like the stock field otherwise.
+    """
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        field = super().many_init(*args, **kwargs)
+        field.__class__ = BulkManyRelatedField
+        return field
+
+
+class BulkManyRelatedField(serializers.ManyRelatedField):
+    """ many=True wrapper for BulkPrimaryKeyRelatedField; errors match the per-id field. """
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        child = self.child_relation
+        queryset = child.get_queryset()
+        pks = []
+        for item in data:
+            if isinstance(item, bool):
+                child.fail('incorrect_type', data_type=type(item).__name__)
+            try:
+                pks.append(queryset.model._meta.pk.to_python(item))
+            except (TypeError, DjangoValidationError):
+                child.fail('incorrect_type', data_type=type(item).__name__)
+        instances = queryset.in_bulk(pks)
+        for pk in pks:
+            if pk not in instances:
+                child.fail('does_not_exist', pk_value=pk)
+        return [instances[pk] for pk in pks]
+
+
 class SkillSerializer(serializers.ModelSerializer):
     """ Serializer for Skill model. """
     class Meta:
         model = Skill
         fields = ['id', 'name']
 
+    def to_representation(self, instance):
+        return {'id': instance.pk, 'name': instance.name}
+
 class RegisterSerializer(serializers.ModelSerializer):
     """ Serializer for user registration. """
     user_type = serializers.CharField(write_only=True, required=True, help_text="User type ('freelancer' or 'client')")
@@ -38,14 +118,16 @@ class RegisterSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         user_type = validated_data.pop('user_type')
-        # Use create_user to handle password hashing
-        user = User.objects.create_user(
-            username=validated_data['username'],
-            email=validated_data['email'],
-            password=validated_data['password']
-        )
-        # Create the associated profile
-        Profile.objects.create(user=user, user_type=user_type)
+        # Both INSERTs commit together: one commit instead of two, and no user without a profile
+        with transaction.atomic():
+            # Use create_user to handle password hashing
+            user = User.objects.create_user(
+                username=validated_data['username'],
+                email=validated_data['email'],
+                password=validated_data['password']
+            )
+            # Create the associated profile
+            Profile.objects.create(user=user, user_type=user_type)
         return user
 
 class UserSerializer(serializers.ModelSerializer):
@@ -54,6 +136,9 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ('id', 'username', 'email') # Only include fields safe for general display
 
+    def to_representation(self, instance):
+        return {'id': instance.id, 'username': instance.username, 'email': instance.email}
+
 class PortfolioItemSerializer(serializers.ModelSerializer):
     """ Serializer for PortfolioItem model. """
     profile = serializers.PrimaryKeyRelatedField(read_only=True)
@@ -67,7 +152,7 @@ class PortfolioItemSerializer(serializers.ModelSerializer):
 
 class ProfileSerializer(serializers.ModelSerializer):
     """ Serializer for the Profile model. """
-    user = serializers.StringRelatedField(read_only=True)
+    user = serializers.SlugRelatedField(slug_field='username', read_only=True)
     skills = SkillSerializer(many=True, read_only=True)
     # Allows updating skills by providing a list of skill names
     skill_names = serializers.ListField(
@@ -90,6 +175,13 @@ class ProfileSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
          )
 
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """ Join/prefetch the relations rendered by this serializer. """
+        return queryset.select_related('user').prefetch_related(
+            Prefetch('skills', queryset=Skill.objects.only('id', 'name')), 'portfolio_items'
+        )
+
     def update(self, instance, validated_data):
         skill_names = validated_data.pop('skill_names', None)
 
@@ -98,61 +190,164 @@ class ProfileSerializer(serializers.ModelSerializer):
 
         # Handle skill updates if 'skill_names' was provided
         if skill_names is not None: # Use `is not None` to allow empty list to clear skills
-            skill_objects = []
-            for name in skill_names:
-                name_stripped = name.strip()
-                if name_stripped: # Avoid creating empty skills
-                    skill, created = Skill.objects.get_or_create(
-                        name__iexact=name_stripped, # Case-insensitive lookup
-                        defaults={'name': name_stripped} # Use stripped name for creation
-                    )
-                    skill_objects.append(skill)
-            instance.skills.set(skill_objects) # `.set()` handles add/remove automatically
+            instance.skills.set(self._resolve_skills(skill_names)) # `.set()` handles add/remove automatically
 
         return instance
 
+    @staticmethod
+    def _resolve_skills(skill_names):
+        """
+        Map skill names to Skill objects (case-insensitive), creating missing ones.
+        Uses one lookup query plus one bulk insert/re-fetch, regardless of list length.
+        """
+        # Keyed by lowercase name; the first spelling wins for creation
+        wanted = {}
+        for name in skill_names:
+            name_stripped = name.strip()
+            if name_stripped: # Avoid creating empty skills
+                wanted.setdefault(name_stripped.lower(), name_stripped)
+        if not wanted:
+            return []
+
+        skills = {
+            skill.lname: skill
+            for skill in Skill.objects.annotate(lname=Lower('name')).filter(lname__in=wanted)
+        }
+        missing = [name for key, name in wanted.items() if key not in skills]
+        if missing:
+            # ignore_conflicts covers concurrent creation of the same name
+            Skill.objects.bulk_create([Skill(name=name) for name in missing], ignore_conflicts=True)
+            skills.update((skill.name.lower(), skill) for skill in Skill.objects.filter(name__in=missing))
+        return list(skills.values())
+
 
 class ProjectSerializer(serializers.ModelSerializer):
     """ Serializer for Project model. """
-    client = serializers.StringRelatedField(read_only=True)
-    skills_required = SkillSerializer(many=True, read_only=True)
     # Allows setting/updating required skills using a list of Skill IDs
-    skill_ids = serializers.PrimaryKeyRelatedField(
-        queryset=Skill.objects.all(), many=True, write_only=True,
+    # (only the pk is needed to validate and assign them)
+    skill_ids = BulkPrimaryKeyRelatedField(
+        queryset=Skill.objects.only('id'), many=True, write_only=True,
         source='skills_required', required=False # Optional on update/create
     )
 
     class Meta:
         model = Project
-        fields = '__all__' # Include all fields from the model
-        read_only_fields = ('id', 'client', 'created_at', 'updated_at', 'status')
+        # Explicit allow-list of the fields clients actually read/write
+        fields = (
+            'id', 'client', 'title', 'description', 'budget', 'duration',
+            'skills_required', 'skill_ids', 'time_slot', 'status', 'created_at'
+        )
+        read_only_fields = ('id', 'client', 'skills_required', 'created_at', 'status')
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """ Annotate the client's username and prefetch the skills rendered by this serializer. """
+        return queryset.annotate(client_username=F('client__username')).prefetch_related(
+            Prefetch('skills_required', queryset=Skill.objects.only('id', 'name'))
+        )
+
+    @staticmethod
+    def _client_username(obj):
+        """ Annotated username when present; nested/freshly created projects fall back to the FK. """
+        username = getattr(obj, 'client_username', None)
+        if username is None:
+            username = obj.client.username
+        return username
+
+    def to_representation(self, instance):
+        return {
+            'id': instance.id,
+            'client': self._client_username(instance),
+            'title': instance.title,
+            'description': instance.description,
+            'budget': _decimal_str(instance.budget),
+            'duration': instance.duration,
+            'skills_required': [
+                {'id': skill.pk, 'name': skill.name}
+                for skill in instance.skills_required.all()
+            ],
+            'time_slot': instance.time_slot,
+            'status': instance.status,
+            'created_at': _iso_utc(instance.created_at),
+        }
 
 
 class ProposalSerializer(serializers.ModelSerializer):
     """ Serializer for Proposal model. """
-    freelancer = serializers.StringRelatedField(read_only=True)
-    project_title = serializers.CharField(source='project.title', read_only=True)
     # Allows associating with a project by its ID during creation
-    project = serializers.PrimaryKeyRelatedField(queryset=Project.objects.filter(status='open')) # Only allow proposing on open projects
+    # Only the columns read by perform_create/project_title are loaded during validation
+    project = serializers.PrimaryKeyRelatedField(
+        queryset=Project.objects.filter(status='open').only('id', 'title', 'status', 'client')
+    ) # Only allow proposing on open projects
 
     class Meta:
         model = Proposal
+        # project_title is rendered by to_representation only
         fields = (
-            'id', 'project', 'project_title', 'freelancer', 'cover_letter',
+            'id', 'project', 'freelancer', 'cover_letter',
             'proposed_rate', 'status', 'submitted_at', 'time_available', 'additional_info'
         )
         # Fields determined by the system or read-only context
-        read_only_fields = ('id', 'freelancer', 'project_title', 'submitted_at', 'status')
+        read_only_fields = ('id', 'freelancer', 'submitted_at', 'status')
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """ Join the relations rendered by this serializer (freelancer, project title). """
+        return queryset.select_related('project', 'freelancer')
+
+    def to_representation(self, instance):
+        return {
+            'id': instance.id,
+            'project': instance.project_id,
+            'project_title': instance.project.title,
+            'freelancer': instance.freelancer.username,
+            'cover_letter': instance.cover_letter,
+            'proposed_rate': _decimal_str(instance.proposed_rate),
+            'status': instance.status,
+            'submitted_at': _iso_utc(instance.submitted_at),
+            'time_available': instance.time_available,
+            'additional_info': instance.additional_info,
+        }
+
+
+class ContractProjectSummarySerializer(serializers.ModelSerializer):
+    """ Compact read-only project representation embedded in contracts. """
+    class Meta:
+        model = Project
+        fields = ('id', 'title', 'status', 'budget')
 
 
 class ContractSerializer(serializers.ModelSerializer):
-    """ Read-only serializer for Contract model. """
-    project = ProjectSerializer(read_only=True) # Show nested project details
+    """
+    Read-only serializer for Contract model.
+    The project is summarized by default; pass 'project.skills' in the
+    'include' context to embed the full ProjectSerializer instead.
+    """
+    project = ContractProjectSummarySerializer(read_only=True) # Show project summary
     freelancer = UserSerializer(read_only=True) # Show nested freelancer details
 
     class Meta:
         model = Contract
-        fields = '__all__' # Read all fields
+        fields = (
+            'id', 'project', 'freelancer', 'agreed_rate', 'start_date',
+            'end_date', 'is_completed'
+        )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if 'project.skills' in self.context.get('include', ()):
+            fields['project'] = ProjectSerializer(read_only=True) # Opt-in full project details
+        return fields
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, include=()):
+        """ Join/prefetch the relations rendered by this serializer for the given includes. """
+        queryset = queryset.select_related('project', 'freelancer')
+        if 'project.skills' in include:
+            queryset = queryset.select_related('project__client').prefetch_related(
+                Prefetch('project__skills_required', queryset=Skill.objects.only('id', 'name'))
+            )
+        return queryset
 
 
 class MessageSerializer(serializers.ModelSerializer):
@@ -161,36 +356,42 @@ class MessageSerializer(serializers.ModelSerializer):
     sender = serializers.SlugRelatedField(slug_field='username', read_only=True)
     # Read-only field showing receiver's username
     receiver = serializers.SlugRelatedField(slug_field='username', read_only=True)
-    # Write-only field accepting the receiver's username string on create
-    receiver_username = serializers.CharField(write_only=True, required=True)
+    # Write-only field accepting the receiver's username on create; resolved straight to
+    # the receiving User, so the view never looks the user up again. email is loaded too:
+    # the new-message signal mails the receiver
+    receiver_username = serializers.SlugRelatedField(
+        slug_field='username', source='receiver', write_only=True,
+        queryset=User.objects.only('id', 'username', 'email'),
+        error_messages={'does_not_exist': "User '{value}' not found."}
+    )
+    timestamp = FastDateTimeField(read_only=True) # Hot on long chat histories
 
     class Meta:
         model = Message
         fields = ('id', 'sender', 'receiver', 'receiver_username', 'content', 'timestamp')
         read_only_fields = ('id', 'sender', 'receiver', 'timestamp')
 
-    # --- ADDED create METHOD ---
-    def create(self, validated_data):
-        """
-        Create and return a new `Message` instance, removing the temporary
-        'receiver_username' field before calling the model manager.
-        """
-        # Remove receiver_username as it's not a model field
-        validated_data.pop('receiver_username', None)
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """ Join the sender and receiver rendered by this serializer. """
+        return queryset.select_related('sender', 'receiver')
 
-        # sender and receiver objects are automatically added to validated_data
-        # by DRF when serializer.save(sender=sender, receiver=receiver) is called.
-        message = Message.objects.create(**validated_data)
-        return message
+    def validate_receiver_username(self, value):
+        """ Reject messages addressed to the sender. """
+        request = self.context.get('request')
+        if request is not None and value.pk == request.user.pk:
+            raise serializers.ValidationError("You cannot send messages to yourself.")
+        return value
 
 
 class ReviewSerializer(serializers.ModelSerializer):
     """ Serializer for Review model. """
-    reviewer = serializers.StringRelatedField(read_only=True)
-    reviewee = serializers.StringRelatedField(read_only=True)
+    reviewer = serializers.SlugRelatedField(slug_field='username', read_only=True)
+    reviewee = serializers.SlugRelatedField(slug_field='username', read_only=True)
     project_title = serializers.CharField(source='project.title', read_only=True)
     # Allows associating with a project by its ID during creation
-    project = serializers.PrimaryKeyRelatedField(queryset=Project.objects.all())
+    # Only the columns read by perform_create/project_title are loaded during validation
+    project = serializers.PrimaryKeyRelatedField(queryset=Project.objects.only('id', 'title', 'client'))
 
     class Meta:
         model = Review
@@ -200,6 +401,11 @@ class ReviewSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ('id', 'reviewer', 'reviewee', 'created_at', 'project_title')
 
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """ Join the relations rendered by this serializer (reviewer, reviewee, project title). """
+        return queryset.select_related('project', 'reviewer', 'reviewee')
+
     def validate_rating(self, value):
         """ Ensure rating is within the allowed range. """
         if not 1 <= value <= 5:
@@ -209,12 +415,6 @@ class ReviewSerializer(serializers.ModelSerializer):
 
 class NotificationSerializer(serializers.ModelSerializer):
     """ Read-only serializer for Notification model. """
-    recipient = serializers.StringRelatedField(read_only=True)
-    # Use PrimaryKeyRelatedField for related objects - more efficient
-    project = serializers.PrimaryKeyRelatedField(read_only=True, allow_null=True) # Allow null
-    proposal = serializers.PrimaryKeyRelatedField(read_only=True, allow_null=True) # Allow null
-    related_message = serializers.PrimaryKeyRelatedField(read_only=True, allow_null=True) # Allow null
-
     class Meta:
         model = Notification
         # Ensure field names match the model field names
@@ -227,4 +427,45 @@ class NotificationSerializer(serializers.ModelSerializer):
             'id', 'recipient', 'message', 'timestamp', 'project',
             'proposal', 'related_message'
             # 'read' status is updated via specific actions in the view
-        )
\ No newline at end of file
+        )
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """ Join the recipient; the other relations are rendered from their FK ids. """
+        return queryset.select_related('recipient')
+
+    def to_representation(self, instance):
+        # Related ids are read straight from the FK columns - no join or related fetch
+        return {
+            'id': instance.id,
+            'recipient': instance.recipient.username,
+            'message': instance.message,
+            'read': instance.read,
+            'timestamp': _iso_utc(instance.timestamp),
+            'project': instance.project_id,
+            'proposal': instance.proposal_id,
+            'related_message': instance.related_message_id,
+        }
+
+
+class NotificationListSerializer(serializers.Serializer):
+    """
+    Read-only serializer for the notification list, which is fetched with values():
+    each row is a dict of columns, so no Notification instances are built. Renders
+    the same shape as NotificationSerializer.
+    """
+    # Columns fetched by the list queryset
+    columns = ('id', 'message', 'read', 'timestamp', 'project_id', 'proposal_id', 'related_message_id')
+
+    def to_representation(self, row):
+        # The list is scoped to the requesting user, so every row has the same recipient
+        return {
+            'id': row['id'],
+            'recipient': self.context['request'].user.username,
+            'message': row['message'],
+            'read': row['read'],
+            'timestamp': _iso_utc(row['timestamp']),
+            'project': row['project_id'],
+            'proposal': row['proposal_id'],
+            'related_message': row['related_message_id'],
+        }
@@ -1,3 +1,362 @@
+import datetime
+
+from django.core import mail
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import User, Profile, Skill, Project, Proposal, Contract, Notification
+from .serializers import ProjectSerializer
+
+
+def make_user(username, user_type):
+    """ Create a user with a profile of the given type. """
+    user = User.objects.create_user(username, f'{username}@example.com', 'pw')
+    Profile.objects.create(user=user, user_type=user_type)
+    return user
+
+
+class APITestBase(TestCase):
+    """ Shared fixtures: one client, one freelancer and an authenticated API client helper. """
+    def setUp(self):
+        self.client_user = make_user('client', 'client')
+        self.freelancer = make_user('freelancer', 'freelancer')
+
+    def api(self, user):
+        api = APIClient()
+        api.force_authenticate(user)
+        return api
+
+
+class RendererTests(APITestBase):
+    def test_list_field_errors_render_as_400(self):
+        # ListField errors are keyed by int index; they must render, not crash the encoder
+        profile = self.freelancer.profile
+        response = self.api(self.freelancer).patch(
+            f'/api/profiles/{profile.pk}/', {'skill_names': ['Python', '']}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('1', response.json()['skill_names'])
+
+
+class ProfileSkillNamesTests(APITestBase):
+    def test_names_are_case_folded_and_deduplicated(self):
+        Skill.objects.create(name='Python')
+        profile = self.freelancer.profile
+        response = self.api(self.freelancer).patch(
+            f'/api/profiles/{profile.pk}/', {'skill_names': ['python', ' Django ', 'PYTHON', 'django']}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        # The existing spelling is reused and only the first spelling of a new name is created
+        self.assertEqual(sorted(Skill.objects.values_list('name', flat=True)), ['Django', 'Python'])
+        self.assertEqual(sorted(profile.skills.values_list('name', flat=True)), ['Django', 'Python'])
+
+
+class ProjectRetrieveTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.project = Project.objects.create(client=self.client_user, title='P', description='d', budget=10)
+
+    def test_non_numeric_pk_is_404(self):
+        response = self.api(self.client_user).get('/api/projects/abc/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_unchanged_project_revalidates_to_304(self):
+        api = self.api(self.client_user)
+        first = api.get(f'/api/projects/{self.project.pk}/')
+        self.assertEqual(first.status_code, 200)
+        again = api.get(f'/api/projects/{self.project.pk}/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+    def test_edit_changes_etag(self):
+        api = self.api(self.client_user)
+        first = api.get(f'/api/projects/{self.project.pk}/')
+        api.patch(f'/api/projects/{self.project.pk}/', {'title': 'Renamed'}, format='json')
+        again = api.get(f'/api/projects/{self.project.pk}/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.json()['title'], 'Renamed')
+
+
+class ExportTests(APITestBase):
+    def test_export_is_staff_only(self):
+        Project.objects.create(client=self.client_user, title='P', description='d', budget=10)
+        response = self.api(self.freelancer).get('/api/projects/', {'export': '1'})
+        self.assertEqual(response.status_code, 403)
+        self.freelancer.is_staff = True
+        self.freelancer.save()
+        response = self.api(self.freelancer).get('/api/projects/', {'export': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 1)
+
+
+class ProjectSkillsTextTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.django = Skill.objects.create(name='Django')
+        self.python = Skill.objects.create(name='Python')
+        self.project = Project.objects.create(client=self.client_user, title='P', description='d', budget=10)
+        self.project.skills_required.set([self.django, self.python])
+
+    def skills_text(self):
+        return Project.objects.values_list('skills_text', flat=True).get(pk=self.project.pk)
+
+    def search(self, term):
+        response = self.api(self.freelancer).get('/api/projects/', {'search': term})
+        return [row['id'] for row in response.json()['results']]
+
+    def test_skills_text_follows_m2m_changes(self):
+        self.assertEqual(self.skills_text(), 'Django Python')
+        self.project.skills_required.remove(self.python)
+        self.assertEqual(self.skills_text(), 'Django')
+
+    def test_skills_text_follows_rename(self):
+        self.django.name = 'Flask'
+        self.django.save()
+        self.assertEqual(self.skills_text(), 'Flask Python')
+        self.assertEqual(self.search('flask'), [self.project.pk])
+
+    def test_skills_text_follows_delete(self):
+        self.django.delete()
+        self.assertEqual(self.skills_text(), 'Python')
+        self.assertEqual(self.search('django'), [])
+
+
+class SkillETagTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.skill = Skill.objects.create(name='Django')
+        Skill.objects.create(name='Python')
+
+    def revalidate(self):
+        api = APIClient()
+        etag = api.get('/api/skills/')['ETag']
+        return lambda: api.get('/api/skills/', HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_skills_revalidate_to_304(self):
+        self.assertEqual(self.revalidate()().status_code, 304)
+
+    def test_rename_changes_etag(self):
+        get = self.revalidate()
+        self.skill.name = 'Flask'
+        self.skill.save()
+        response = get()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Flask', [row['name'] for row in response.json()])
+
+    def test_delete_changes_etag(self):
+        get = self.revalidate()
+        self.skill.delete()
+        self.assertEqual(get().status_code, 200)
+
+
+class NotificationETagTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.notifications = [
+            Notification.objects.create(recipient=self.freelancer, message=f'n{i}') for i in range(6)
+        ]
+
+    def test_read_flag_changes_change_etag(self):
+        api = self.api(self.freelancer)
+        first, second, third, fourth = (n.pk for n in self.notifications[:4])
+        # read={first, fourth} and read={second, third}: same count and same id sum
+        for pk in (first, fourth):
+            api.patch(f'/api/notifications/{pk}/mark-read/')
+        etag = api.get('/api/notifications/')['ETag']
+        for pk in (first, fourth):
+            api.patch(f'/api/notifications/{pk}/mark-unread/')
+        for pk in (second, third):
+            api.patch(f'/api/notifications/{pk}/mark-read/')
+        response = api.get('/api/notifications/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_marking_someone_elses_notification_is_a_404(self):
+        pk = self.notifications[0].pk
+        for path in (f'/api/notifications/{pk}/mark-read/', '/api/notifications/999999/mark-read/'):
+            self.assertEqual(self.api(self.client_user).patch(path).status_code, 404)
+        self.assertFalse(Notification.objects.get(pk=pk).read)
+
+    def test_unchanged_feed_revalidates_to_304(self):
+        api = self.api(self.freelancer)
+        etag = api.get('/api/notifications/')['ETag']
+        self.assertEqual(api.get('/api/notifications/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+class SkillIdTests(APITestBase):
+    def post_project(self, skill_ids):
+        payload = {'title': 'P', 'description': 'd', 'budget': '10', 'skill_ids': skill_ids}
+        return self.api(self.client_user).post('/api/projects/', payload, format='json')
+
+    def test_skill_ids_resolve_in_one_query(self):
+        skills = [Skill.objects.create(name=name) for name in ('Django', 'Python', 'SQL')]
+        serializer = ProjectSerializer(data={
+            'title': 'P', 'description': 'd', 'budget': '10', 'skill_ids': [s.pk for s in skills]
+        })
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data['skills_required'], skills)
+
+    def test_unknown_or_malformed_skill_id_is_a_400(self):
+        skill = Skill.objects.create(name='Django')
+        for skill_ids in ([skill.pk, skill.pk + 100], ['abc'], [True], 'abc'):
+            response = self.post_project(skill_ids)
+            self.assertEqual(response.status_code, 400, skill_ids)
+            self.assertIn('skill_ids', response.json())
+
+
+class UnreadCountTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        cache.clear() # User ids repeat across tests
+
+    def unread_count(self):
+        return self.api(self.freelancer).get('/api/notifications/unread-count/').json()['unread_count']
+
+    def test_count_follows_writes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            notification = Notification.objects.create(recipient=self.freelancer, message='n')
+        self.assertEqual(self.unread_count(), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api(self.freelancer).patch(f'/api/notifications/{notification.pk}/mark-read/')
+        self.assertEqual(self.unread_count(), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            Notification.objects.create(recipient=self.freelancer, message='n')
+        self.assertEqual(self.unread_count(), 1)
+
+    def test_count_follows_detail_patch_and_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            notification = Notification.objects.create(recipient=self.freelancer, message='n')
+        self.assertEqual(self.unread_count(), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api(self.freelancer).patch(f'/api/notifications/{notification.pk}/', {'read': True}, format='json')
+        self.assertEqual(self.unread_count(), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api(self.freelancer).patch(f'/api/notifications/{notification.pk}/', {'read': False}, format='json')
+        self.assertEqual(self.unread_count(), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api(self.freelancer).delete(f'/api/notifications/{notification.pk}/')
+        self.assertEqual(self.unread_count(), 0)
+
+
+class ProposalStatusTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.project = Project.objects.create(client=self.client_user, title='P', description='d', budget=10)
+        self.other = make_user('other', 'freelancer')
+        self.proposal = Proposal.objects.create(
+            project=self.project, freelancer=self.freelancer, cover_letter='c', proposed_rate=5
+        )
+        self.sibling = Proposal.objects.create(
+            project=self.project, freelancer=self.other, cover_letter='c', proposed_rate=6
+        )
+
+    def update_status(self, proposal, new_status):
+        return self.api(self.client_user).patch(
+            f'/api/proposals/{proposal.pk}/update-status/', {'status': new_status}, format='json'
+        )
+
+    def test_accept_creates_contract_and_rejects_siblings(self):
+        response = self.update_status(self.proposal, 'accepted')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'accepted')
+        self.assertTrue(Contract.objects.filter(project=self.project, freelancer=self.freelancer).exists())
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.status, 'in_progress')
+        self.sibling.refresh_from_db()
+        self.assertEqual(self.sibling.status, 'rejected')
+        self.assertTrue(Notification.objects.filter(recipient=self.other, proposal=self.sibling).exists())
+
+    def test_acceptance_mail_waits_for_commit(self):
+        mail.outbox = []
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.update_status(self.proposal, 'accepted')
+            self.assertEqual(mail.outbox, [])
+        self.assertTrue(callbacks)
+        self.assertIn(self.freelancer.email, [to for sent in mail.outbox for to in sent.to])
+
+    def test_existing_contract_is_a_409_and_rolls_back(self):
+        Contract.objects.create(
+            project=self.project, freelancer=self.other, agreed_rate=6, start_date=datetime.date.today()
+        )
+        mail.outbox = [] # Drop the 'new proposal' mails sent during setUp
+        response = self.update_status(self.proposal, 'accepted')
+        self.assertEqual(response.status_code, 409)
+        self.proposal.refresh_from_db()
+        self.assertEqual(self.proposal.status, 'pending')
+        # The freelancer is never told about an acceptance that did not happen
+        self.assertEqual(mail.outbox, [])
+        self.assertFalse(Notification.objects.filter(recipient=self.freelancer).exists())
+
+    def test_reject_leaves_project_and_siblings_alone(self):
+        self.assertEqual(self.update_status(self.proposal, 'rejected').status_code, 200)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.status, 'open')
+        self.sibling.refresh_from_db()
+        self.assertEqual(self.sibling.status, 'pending')
+        self.assertFalse(Contract.objects.filter(project=self.project).exists())
+
+    def test_second_accept_is_a_400(self):
+        self.update_status(self.proposal, 'accepted')
+        self.assertEqual(self.update_status(self.proposal, 'accepted').status_code, 400)
+        self.assertEqual(Contract.objects.filter(project=self.project).count(), 1)
+
+    def test_only_the_project_client_may_update(self):
+        response = self.api(self.other).patch(
+            f'/api/proposals/{self.proposal.pk}/update-status/', {'status': 'accepted'}, format='json'
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class ProposalUniquenessTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.first = Project.objects.create(client=self.client_user, title='A', description='d', budget=10)
+        self.second = Project.objects.create(client=self.client_user, title='B', description='d', budget=10)
+
+    def propose(self, project):
+        return self.api(self.freelancer).post(
+            '/api/proposals/', {'project': project.pk, 'cover_letter': 'c', 'proposed_rate': '5'}, format='json'
+        )
+
+    def test_duplicate_proposal_is_a_400(self):
+        self.assertEqual(self.propose(self.first).status_code, 201)
+        response = self.propose(self.first)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Proposal.objects.filter(project=self.first, freelancer=self.freelancer).count(), 1)
+
+    def test_moving_onto_an_already_proposed_project_is_a_400(self):
+        self.propose(self.first)
+        moved = self.propose(self.second).json()['id']
+        response = self.api(self.freelancer).patch(
+            f'/api/proposals/{moved}/', {'project': self.first.pk}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class ReviewUniquenessTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.projects = []
+        for title in ('A', 'B'):
+            project = Project.objects.create(client=self.client_user, title=title, description='d', budget=10)
+            Contract.objects.create(
+                project=project, freelancer=self.freelancer, agreed_rate=5, start_date=datetime.date.today()
+            )
+            self.projects.append(project)
+
+    def review(self, project):
+        return self.api(self.client_user).post(
+            '/api/reviews/', {'project': project.pk, 'rating': 5, 'comment': 'ok'}, format='json'
+        )
+
+    def test_duplicate_review_is_a_400(self):
+        self.assertEqual(self.review(self.projects[0]).status_code, 201)
+        self.assertEqual(self.review(self.projects[0]).status_code, 400)
 
-# Create your tests here.
+    def test_moving_onto_an_already_reviewed_project_is_a_400(self):
+        self.review(self.projects[0])
+        moved = self.review(self.projects[1]).json()['id']
+        response = self.api(self.client_user).patch(
+            f'/api/reviews/{moved}/', {'project': self.projects[0].pk}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
@@ -22,9 +22,6 @@ router.register(r'notifications', NotificationViewSet, basename='notification')
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('', include(router.urls)),
-    # Note: update_status is now handled within the router using @action,
-    # so this specific path might not be needed unless you want a different URL structure.
-    # The default URL for the action would be /api/proposals/{pk}/update_status/
-    # If you keep this path, ensure the view mapping is correct:
-    # path('proposals/<int:pk>/update_status/', ProposalViewSet.as_view({'patch': 'update_status'}), name='proposal-update-status'),
+    # ProposalViewSet.update_status is routed by the router's @action:
+    # PATCH /api/proposals/{pk}/update-status/
 ]
\ No newline at end of file
@@ -4,22 +4,38 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 from .models import ( # Ensure all models are imported
     User, Profile, Skill, Project, Proposal, Contract, Message, Review,
-    PortfolioItem, Notification
+    PortfolioItem, Notification, proposal_rejected_message,
+    UNREAD_COUNT_CACHE_TIMEOUT, unread_count_cache_key, invalidate_unread_count
 )
 from .serializers import ( # Ensure all serializers are imported
     RegisterSerializer, UserSerializer, ProfileSerializer, SkillSerializer,
     ProjectSerializer, ProposalSerializer, ContractSerializer, MessageSerializer,
-    ReviewSerializer, PortfolioItemSerializer, NotificationSerializer
+    ReviewSerializer, PortfolioItemSerializer, NotificationSerializer,
+    NotificationListSerializer
 )
+from .pagination import (
+    TimestampCursorPagination, CreatedAtCursorPagination, SubmittedAtCursorPagination,
+    StartDateCursorPagination
+)
+from .renderers import OrjsonRenderer
 from rest_framework.decorators import action
 from rest_framework.response import Response # Ensure Response is imported
 import datetime
 # Corrected import for transaction
-from django.db.models import Q
-from django.db import transaction # Corrected import
+from django.db.models import Q, Avg, Count, Max, Exists, OuterRef
+from django.db import transaction, IntegrityError, OperationalError # Corrected import
 from rest_framework.exceptions import PermissionDenied, ValidationError, NotFound
 from django.contrib.auth import get_user_model # Import User model getter
 from django.shortcuts import get_object_or_404 # Useful for getting objects or 404
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import etag
+from django.views.decorators.vary import vary_on_headers
+from django.core.cache import cache
+from django.http import StreamingHttpResponse, Http404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 import logging # Import logging
 
 # Get an instance of a logger
@@ -30,64 +46,123 @@ logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
+# --- Request helpers ---
+
+def get_request_profile(request):
+    """ Return the requesting user's Profile (or None), memoized on the request. """
+    try:
+        return request._cached_profile
+    except AttributeError:
+        pass
+    user = request.user
+    profile = getattr(user, 'profile', None) if user and user.is_authenticated else None
+    request._cached_profile = profile
+    return profile
+
+
 # --- Permission Classes ---
-# ... (IsOwnerOrReadOnly, IsClient, IsFreelancer remain the same) ...
+
+# Per-model ownership checks for IsOwnerOrReadOnly, keyed by model class.
+# Each compares FK ids, so the related owner row is never loaded.
+OWNER_CHECKS = {
+    Profile: lambda obj, request: obj.user_id == request.user.id,
+    # Compare against the requester's memoized profile instead of loading obj.profile
+    PortfolioItem: lambda obj, request: obj.profile_id == getattr(get_request_profile(request), 'id', None),
+    Project: lambda obj, request: obj.client_id == request.user.id,
+    # Freelancer can only edit/delete PENDING proposals
+    Proposal: lambda obj, request: obj.freelancer_id == request.user.id and obj.status == 'pending',
+    Contract: lambda obj, request: obj.freelancer_id == request.user.id,
+    Review: lambda obj, request: obj.reviewer_id == request.user.id,
+    Notification: lambda obj, request: obj.recipient_id == request.user.id,
+    # Allow sender to modify/delete their own messages (typically only DELETE makes sense)
+    Message: lambda obj, request: obj.sender_id == request.user.id,
+}
+
+
 class IsOwnerOrReadOnly(permissions.BasePermission):
     """
     Custom permission to only allow owners of an object to edit it.
-    Assumes the model instance has an 'user', 'profile.user', 'client',
-    'freelancer', 'reviewer', or 'recipient' attribute.
+    Ownership is looked up per model class in OWNER_CHECKS; models without
+    an entry are not editable through this permission.
     Handles Proposal specific logic (only editable if pending).
     """
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
 
-        owner = None
-        if hasattr(obj, 'user'): # e.g., Profile.user (if obj is Profile)
-            owner = obj.user
-        elif hasattr(obj, 'profile') and hasattr(obj.profile, 'user'): # e.g., PortfolioItem.profile.user
-            owner = obj.profile.user
-        elif hasattr(obj, 'client'): # e.g., Project.client
-            owner = obj.client
-        elif hasattr(obj, 'freelancer'): # e.g., Proposal.freelancer, Contract.freelancer
-            owner = obj.freelancer
-            # Freelancer can only edit/delete PENDING proposals (status check moved here for clarity)
-            if isinstance(obj, Proposal) and obj.status != 'pending':
-                return False
-        elif hasattr(obj, 'reviewer'): # e.g., Review.reviewer
-            owner = obj.reviewer
-        elif hasattr(obj, 'recipient'): # e.g., Notification.recipient
-            owner = obj.recipient
-        elif hasattr(obj, 'sender') and isinstance(obj, Message): # For Messages, allow sender to delete? (Adjust logic if needed)
-             # Example: allow sender to modify/delete their own messages.
-             # Be careful with PUT/PATCH allowing sender change. Typically only DELETE makes sense.
-             owner = obj.sender
-        # Add other ownership checks if needed
-
-        # Ensure owner was found and matches the request user
-        return owner is not None and owner == request.user
+        check = OWNER_CHECKS.get(type(obj))
+        return check is not None and check(obj, request)
 
 class IsClient(permissions.BasePermission):
     """ Allows access only to authenticated clients with profiles. """
     def has_permission(self, request, view):
-        # Check if user is authenticated, has a profile, and type is 'client'
-        # Use getattr for safer access to profile
-        profile = getattr(request.user, 'profile', None)
-        return (request.user and
-                request.user.is_authenticated and
-                profile is not None and
-                profile.user_type == 'client')
+        # Happy path is one attribute chain; get_request_profile() returns None
+        # for anonymous/profile-less users, which lands in the except branch
+        try:
+            return get_request_profile(request).user_type == 'client'
+        except AttributeError:
+            return False
 
 class IsFreelancer(permissions.BasePermission):
     """ Allows access only to authenticated freelancers with profiles. """
     def has_permission(self, request, view):
-        # Check if user is authenticated, has a profile, and type is 'freelancer'
-        profile = getattr(request.user, 'profile', None)
-        return (request.user and
-                request.user.is_authenticated and
-                profile is not None and
-                profile.user_type == 'freelancer')
+        # Same single attribute chain as IsClient
+        try:
+            return get_request_profile(request).user_type == 'freelancer'
+        except AttributeError:
+            return False
+
+
+# --- Mixins ---
+
+class EagerLoadingMixin:
+    """
+    Applies the serializer's setup_eager_loading() to a queryset, except for
+    actions that render no objects (a delete returns an empty 204).
+    Read-only actions also narrow the query to get_read_columns(), which skips
+    unrendered columns of the row and its joins (descriptions, password hashes, ...);
+    writes keep the full row, e.g. for auto_now fields.
+    """
+    no_eager_loading_actions = ('destroy',)
+    read_column_actions = ('list', 'retrieve')
+    read_columns = None
+
+    def get_read_columns(self):
+        return self.read_columns
+
+    def eager_load(self, queryset, **kwargs):
+        if self.action in self.no_eager_loading_actions:
+            return queryset
+        queryset = self.get_serializer_class().setup_eager_loading(queryset, **kwargs)
+        read_columns = self.get_read_columns()
+        if read_columns and self.action in self.read_column_actions:
+            queryset = queryset.only(*read_columns)
+        return queryset
+
+
+class StreamingListMixin:
+    """
+    Adds a staff-only export mode to list(): with `?export=1` every matching row is
+    streamed as JSON lines from a chunked iterator instead of being materialized in memory.
+    The regular list response is left untouched.
+    """
+    export_chunk_size = 2000
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('export') != '1':
+            return super().list(request, *args, **kwargs)
+        if not request.user.is_staff: # Export bypasses pagination, so it is not open to everyone
+            raise PermissionDenied("Only staff can export.")
+
+        queryset = self.filter_queryset(self.get_queryset())
+        renderer = OrjsonRenderer() # Same encoder as regular responses
+
+        def rows():
+            # chunk_size keeps prefetch_related working with iterator()
+            for obj in queryset.iterator(chunk_size=self.export_chunk_size):
+                yield renderer.render(self.get_serializer(obj).data) + b'\n'
+
+        return StreamingHttpResponse(rows(), content_type='application/x-ndjson')
 
 
 # --- ViewSets ---
@@ -98,30 +173,34 @@ class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
 
 
-class ProfileViewSet(viewsets.ModelViewSet):
+class ProfileViewSet(EagerLoadingMixin, StreamingListMixin, viewsets.ModelViewSet):
     """ ViewSet for viewing and editing user profiles. """
     serializer_class = ProfileSerializer
+    # Staff exports stream every profile; each row prefetches skills and portfolio items,
+    # so chunks are kept smaller than the default
+    export_chunk_size = 500
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly] # Must be logged in, can only edit own profile
 
     def get_queryset(self):
         """ Admins see all, users see their own profile. """
         user = self.request.user
         if user.is_authenticated:
+            # Relations rendered by the serializer are joined/prefetched by the serializer itself
+            queryset = self.eager_load(Profile.objects.order_by('id')) # Stable order for pagination
             if user.is_staff: # Admins can list/view all profiles
-                return Profile.objects.select_related('user').prefetch_related('skills', 'portfolio_items').all()
+                return queryset
             # Regular authenticated users can only access their own profile
-            # Added prefetch_related for portfolio items here as well
-            return Profile.objects.select_related('user').prefetch_related('skills', 'portfolio_items').filter(user=user)
+            return queryset.filter(user=user)
         return Profile.objects.none() # Anonymous users see nothing
 
     def perform_update(self, serializer):
         # IsOwnerOrReadOnly permission already ensures user is updating their own profile
-        instance = serializer.save() # Saves validated data from serializer (excluding skill_names, profile_picture)
-
-        # Handle profile picture upload if present in the request
+        extra = {}
+        # profile_picture is read-only on the serializer; pass an uploaded file in
+        # through save() so it is written by the same UPDATE as the other fields
         if 'profile_picture' in self.request.FILES:
-            instance.profile_picture = self.request.FILES['profile_picture']
-            instance.save(update_fields=['profile_picture']) # Save only the picture field
+            extra['profile_picture'] = self.request.FILES['profile_picture']
+        instance = serializer.save(**extra)
 
         # After saving, return the instance so DRF can serialize the response
         return instance
@@ -137,14 +216,14 @@ class PortfolioItemViewSet(viewsets.ModelViewSet):
         """ Freelancers see their own portfolio items. """
         user = self.request.user
         # Check if the user has a profile before filtering
-        profile = getattr(user, 'profile', None)
+        profile = get_request_profile(self.request)
         if profile and profile.user_type == 'freelancer':
             return PortfolioItem.objects.filter(profile=profile).order_by('-created_at')
         return PortfolioItem.objects.none()
 
     def perform_create(self, serializer):
         """ Associate the new portfolio item with the freelancer's profile. """
-        profile = getattr(self.request.user, 'profile', None)
+        profile = get_request_profile(self.request)
         # Ensure user has a profile and is a freelancer
         if not profile:
              raise PermissionDenied("User profile required to add portfolio items.")
@@ -154,23 +233,60 @@ class PortfolioItemViewSet(viewsets.ModelViewSet):
         serializer.save(profile=profile)
 
 
+def skill_etag(request, *args, **kwargs):
+    """ ETag for the skill table: changes when a skill is added, removed or renamed. """
+    try:
+        return request._skill_etag # Also used as the list cache key; compute once per request
+    except AttributeError:
+        pass
+    # Read from the database, so every worker agrees: count/max id change on adds and deletes,
+    # max updated_at on renames (bulk_create() fills auto_now too)
+    stats = Skill.objects.aggregate(count=Count('id'), max_id=Max('id'), changed=Max('updated_at'))
+    changed = stats['changed'].timestamp() if stats['changed'] else 0
+    request._skill_etag = f"skills-{stats['count']}-{stats['max_id']}-{changed}"
+    return request._skill_etag
+
+
+# Skills are public and rarely change: let clients cache them and revalidate with If-None-Match
+skill_http_caching = [cache_control(public=True, max_age=300), etag(skill_etag)]
+
+
+@method_decorator(skill_http_caching, name='list')
+@method_decorator(skill_http_caching, name='retrieve')
 class SkillViewSet(viewsets.ReadOnlyModelViewSet):
     """ Read-only ViewSet for listing skills. """
     queryset = Skill.objects.all().order_by('name') # Order alphabetically
     serializer_class = SkillSerializer
     permission_classes = [permissions.AllowAny] # Anyone can view the list of available skills
+    pagination_class = None # Small lookup table; skill pickers need the full list
+    list_cache_timeout = 300 # seconds
 
+    def list(self, request, *args, **kwargs):
+        """ Serve the serialized skill list from the cache while the table is unchanged. """
+        # Keyed by the ETag, so any add/rename/delete switches to a fresh entry
+        cache_key = f"api:skills:list:{skill_etag(request)}"
+        data = cache.get(cache_key)
+        if data is None:
+            data = list(self.get_serializer(self.filter_queryset(self.get_queryset()), many=True).data)
+            cache.set(cache_key, data, timeout=self.list_cache_timeout)
+        return Response(data)
 
-class ProjectViewSet(viewsets.ModelViewSet):
+
+class ProjectViewSet(EagerLoadingMixin, StreamingListMixin, viewsets.ModelViewSet):
     """ ViewSet for creating, viewing, updating, and deleting projects. """
-    # Optimized queryset
-    queryset = Project.objects.all().select_related('client__profile').prefetch_related('skills_required').order_by('-created_at') # Added client__profile
+    queryset = Project.objects.all().order_by('-created_at')
+    pagination_class = CreatedAtCursorPagination # Keyset pages, no COUNT(*)
+    # Columns rendered by ProjectSerializer; read-only actions select nothing else
+    read_columns = (
+        'id', 'title', 'description', 'budget', 'duration', 'time_slot',
+        'status', 'created_at', 'client' # client username comes from the serializer's annotation
+    )
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticated] # Base permission, refined in get_permissions
     # Filtering, Searching, Ordering configuration
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'skills_required', 'client__username'] # Fields for exact filtering
-    search_fields = ['title', 'description', 'skills_required__name'] # Fields for text search
+    search_fields = ['title', 'description', 'skills_text'] # Denormalized skill names: no M2M join/DISTINCT
     ordering_fields = ['budget', 'created_at', 'duration'] # Fields allowed for ordering
 
     def get_permissions(self):
@@ -197,27 +313,25 @@ class ProjectViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """ Filter projects based on user role and authentication status. """
         user = self.request.user
-        # Start with the base optimized queryset
-        queryset = super().get_queryset()
+        # Start with the base queryset, eager-loaded for the serializer (except on delete)
+        queryset = self.eager_load(super().get_queryset())
 
         if not user.is_authenticated:
             return Project.objects.none() # No projects for anonymous users
 
-        profile = getattr(user, 'profile', None)
+        profile = get_request_profile(self.request)
         if profile:
             if profile.user_type == 'client':
                 # Clients see only their projects
                 return queryset.filter(client=user)
             elif profile.user_type == 'freelancer':
                 # Freelancers see 'open' projects + projects they proposed on + projects they have contracts for
-                # Optimize by fetching related project IDs once
-                proposed_project_ids = Proposal.objects.filter(freelancer=user).values_list('project_id', flat=True)
-                contracted_project_ids = Contract.objects.filter(freelancer=user).values_list('project_id', flat=True)
+                # Correlated EXISTS checks never join extra rows in, so no DISTINCT is needed
+                has_proposal = Exists(Proposal.objects.filter(project=OuterRef('pk'), freelancer=user))
+                has_contract = Exists(Contract.objects.filter(project=OuterRef('pk'), freelancer=user))
 
                 # Combine filters using Q objects
-                return queryset.filter(
-                    Q(status='open') | Q(id__in=proposed_project_ids) | Q(id__in=contracted_project_ids)
-                ).distinct() # Use distinct to avoid duplicates if proposed and contracted
+                return queryset.filter(Q(status='open') | has_proposal | has_contract)
         # Admins see all projects
         elif user.is_staff:
             return queryset
@@ -225,11 +339,46 @@ class ProjectViewSet(viewsets.ModelViewSet):
         # Fallback for authenticated users without a profile (should be rare) - show only open projects
         return queryset.filter(status='open')
 
-
-class ProposalViewSet(viewsets.ModelViewSet):
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Project detail with conditional GET: the ETag and Last-Modified come from
+        updated_at alone, so an unchanged project revalidates to a 304 without
+        loading or serializing the row.
+        """
+        # Same visibility rules as the full fetch; only the timestamp is selected
+        try:
+            updated_at = self.get_queryset().prefetch_related(None).filter(
+                pk=kwargs[self.lookup_field]
+            ).values_list('updated_at', flat=True).first()
+        except (TypeError, ValueError): # Non-numeric pk: no such project
+            raise Http404
+        if updated_at is None: # Missing or not visible: let the regular lookup raise 404
+            return super().retrieve(request, *args, **kwargs)
+
+        validators = {
+            # The ETag keeps microseconds; Last-Modified only has second resolution
+            'etag': quote_etag(f"project-{kwargs[self.lookup_field]}-{updated_at.timestamp()}"),
+            'last_modified': int(updated_at.timestamp()),
+        }
+        response = get_conditional_response(request, **validators)
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+            response['ETag'] = validators['etag']
+            response['Last-Modified'] = http_date(validators['last_modified'])
+        patch_cache_control(response, private=True, no_cache=True) # Always revalidate
+        return response
+
+
+class ProposalViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ ViewSet for managing project proposals. """
-    # Optimized queryset
-    queryset = Proposal.objects.all().select_related('project__client', 'freelancer__profile').order_by('-submitted_at') # Added profile relations
+    queryset = Proposal.objects.all().order_by('-submitted_at')
+    pagination_class = SubmittedAtCursorPagination # Keyset pages, no COUNT(*)
+    # Columns rendered by ProposalSerializer; read-only actions select nothing else
+    read_columns = (
+        'id', 'cover_letter', 'proposed_rate', 'time_available', 'additional_info',
+        'status', 'submitted_at', 'project__id', 'project__title',
+        'freelancer__id', 'freelancer__username'
+    )
     serializer_class = ProposalSerializer
     permission_classes = [permissions.IsAuthenticated] # Base permission
 
@@ -258,32 +407,41 @@ class ProposalViewSet(viewsets.ModelViewSet):
         project = serializer.validated_data.get('project')
         user = self.request.user
 
-        # Ensure project exists and is open (serializer queryset also helps)
-        if not project or project.status != 'open':
-             raise ValidationError("Project not found or is not open for proposals.")
-
         # Ensure client cannot propose on their own project (although IsFreelancer perm should prevent this)
-        if project.client == user:
+        if project.client_id == user.id:
              raise PermissionDenied("Clients cannot submit proposals for their own projects.")
 
-        # Prevent duplicate proposals from the same freelancer for the same project
-        if Proposal.objects.filter(project=project, freelancer=user).exists():
+        # Set freelancer automatically and save. Duplicates are rejected by the
+        # uniq_proposal_per_freelancer constraint; the savepoint keeps any outer transaction usable.
+        try:
+            with transaction.atomic():
+                # The serializer only offers open projects, but an accept may have committed since.
+                # Re-check under the same row lock update_status takes, so the two serialize.
+                if not Project.objects.select_for_update().filter(pk=project.pk, status='open').exists():
+                    raise ValidationError("Project not found or is not open for proposals.")
+                serializer.save(freelancer=user)
+        except IntegrityError:
              raise ValidationError("You have already submitted a proposal for this project.")
 
-        # Set freelancer automatically and save
-        serializer.save(freelancer=user)
+    def perform_update(self, serializer):
+        """ Save in a savepoint; moving a proposal onto a project already proposed on hits the constraint. """
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
+             raise ValidationError("You have already submitted a proposal for this project.")
 
     # perform_update and perform_destroy rely on IsOwnerOrReadOnly permission check
 
     def get_queryset(self):
         """ Filter proposals based on user role. """
         user = self.request.user
-        queryset = super().get_queryset() # Use the optimized queryset from class definition
+        queryset = self.eager_load(super().get_queryset())
 
         if not user.is_authenticated:
             return Proposal.objects.none()
 
-        profile = getattr(user, 'profile', None)
+        profile = get_request_profile(self.request)
         if profile:
             if profile.user_type == 'freelancer':
                 # Freelancer sees their proposals
@@ -300,85 +458,122 @@ class ProposalViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['patch'], url_path='update-status', permission_classes=[permissions.IsAuthenticated])
     def update_status(self, request, pk=None):
         """ Custom action for clients to accept or reject proposals. """
-        proposal = get_object_or_404(Proposal.objects.select_related('project', 'freelancer'), pk=pk) # Optimize lookup
-
-        # Ensure the request user is the client for this project
-        if proposal.project.client != request.user:
-             raise PermissionDenied("You do not have permission to modify this proposal's status.")
-
         new_status = request.data.get('status')
-        if new_status not in ['accepted', 'rejected']:
-            return Response({'detail': 'Invalid status. Must be "accepted" or "rejected".'}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Ensure proposal is pending before changing status
-        if proposal.status != 'pending':
-             return Response({'detail': f'Proposal status is already "{proposal.status}".'}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Ensure project hasn't already been assigned (edge case)
-        if new_status == 'accepted' and proposal.project.status != 'open':
-            return Response({'detail': f'Project status is already "{proposal.project.status}". Cannot accept proposal.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            with transaction.atomic(): # Ensure atomicity for related updates
-                # Update the proposal status (this triggers the post_save signal *after* transaction commit)
-                proposal.status = new_status
-                proposal.save(update_fields=['status']) # Save proposal status change
-
-                # If accepted, create contract, update project, reject others
-                if new_status == 'accepted':
-                    # Create contract (get_or_create handles potential race conditions)
-                    contract, created = Contract.objects.get_or_create(
+        # Everything below runs in one transaction: any error rolls back every write
+        with transaction.atomic():
+            # Lock the proposal and its project (not the joined freelancer, who may be accepted
+            # on other projects at the same time) so concurrent accepts cannot both proceed.
+            # nowait: a competing request fails fast instead of queueing behind the lock only
+            # to be refused once it is released.
+            # The project description is never read here, so skip the long text column.
+            try:
+                proposal = get_object_or_404(
+                    Proposal.objects.select_for_update(nowait=True, of=('self', 'project'))
+                    .select_related('project', 'freelancer').defer('project__description'),
+                    pk=pk
+                )
+            except OperationalError: # Lock not available; other database errors propagate
+                # Nothing has been written yet; roll back the failed statement's transaction
+                transaction.set_rollback(True)
+                return Response(
+                    {'detail': 'This proposal is being updated by another request. Please try again.'},
+                    status=status.HTTP_409_CONFLICT
+                )
+
+            # Ensure the request user is the client for this project (FK id compare, no client fetch)
+            if proposal.project.client_id != request.user.id:
+                 raise PermissionDenied("You do not have permission to modify this proposal's status.")
+
+            if new_status not in ['accepted', 'rejected']:
+                return Response({'detail': 'Invalid status. Must be "accepted" or "rejected".'}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Ensure proposal is pending before changing status
+            if proposal.status != 'pending':
+                 return Response({'detail': f'Proposal status is already "{proposal.status}".'}, status=status.HTTP_400_BAD_REQUEST)
+
+            # Ensure project hasn't already been assigned (edge case)
+            if new_status == 'accepted' and proposal.project.status != 'open':
+                return Response({'detail': f'Project status is already "{proposal.project.status}". Cannot accept proposal.'}, status=status.HTTP_400_BAD_REQUEST)
+
+            if new_status == 'accepted':
+                # Create contract with a plain INSERT: the locked project was just checked to be
+                # open, so no prior SELECT is needed. Contract.project is one-to-one, so a
+                # concurrent accept still fails here and gets a 409 like a locked proposal does.
+                # It runs before the status save below, whose signal notifies the freelancer.
+                try:
+                    Contract.objects.create(
                         project=proposal.project,
-                        defaults={
-                            'freelancer': proposal.freelancer,
-                            'agreed_rate': proposal.proposed_rate,
-                            'start_date': datetime.date.today() # Or get from proposal/request if needed
-                        }
+                        freelancer=proposal.freelancer,
+                        agreed_rate=proposal.proposed_rate,
+                        start_date=datetime.date.today() # Or get from proposal/request if needed
                     )
-                    # Only proceed if the contract was newly created by this acceptance
-                    if created:
-                        # Update project status
-                        proposal.project.status = 'in_progress'
-                        proposal.project.save(update_fields=['status'])
-
-                        # Reject other *pending* proposals for this project
-                        Proposal.objects.filter(
-                            project=proposal.project, status='pending'
-                        ).exclude(pk=proposal.pk).update(status='rejected')
-                    else:
-                        # If contract already existed (shouldn't happen with project status check), raise error
-                         raise ValidationError("Contract for this project already exists.")
-
-
-        except Exception as e:
-             # Log the detailed error
-             logger.error(f"Error during proposal status update (ID: {proposal.pk}) to '{new_status}': {e}", exc_info=True)
-             # Inform user of failure
-             return Response({
-                 'detail': f'Failed to update proposal status or related objects: {e}'
-             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                except IntegrityError:
+                    transaction.set_rollback(True) # Nothing else has been written yet
+                    return Response(
+                        {'detail': 'Contract for this project already exists.'},
+                        status=status.HTTP_409_CONFLICT
+                    )
+
+            # Update the proposal status (this triggers the post_save signal)
+            proposal.status = new_status
+            proposal.save(update_fields=['status']) # Save proposal status change
+
+            # If accepted, update project and reject others
+            if new_status == 'accepted':
+                # Update project status with a narrow UPDATE (no model save/signals);
+                # updated_at is bumped explicitly since auto_now only applies on save()
+                Project.objects.filter(pk=proposal.project_id).update(status='in_progress', updated_at=timezone.now())
+                proposal.project.status = 'in_progress' # Keep the loaded instance consistent
+
+                # Reject other *pending* proposals for this project. The bulk UPDATE skips the
+                # post_save signal, so their notifications are written with one bulk INSERT.
+                siblings = list(
+                    Proposal.objects.select_for_update().filter(
+                        project_id=proposal.project_id, status='pending'
+                    ).exclude(pk=proposal.pk).values_list('id', 'freelancer_id')
+                )
+                if siblings:
+                    Proposal.objects.filter(pk__in=[sibling_id for sibling_id, _ in siblings]).update(status='rejected')
+                    message = proposal_rejected_message(proposal.project.title)
+                    Notification.objects.bulk_create([
+                        Notification(
+                            recipient_id=freelancer_id, message=message,
+                            project_id=proposal.project_id, proposal_id=sibling_id
+                        )
+                        for sibling_id, freelancer_id in siblings
+                    ], batch_size=500)
+                    # bulk_create skips post_save, so drop the cached unread counts here
+                    for _, freelancer_id in siblings:
+                        invalidate_unread_count(freelancer_id)
 
         # Return the updated proposal
         serializer = self.get_serializer(proposal)
         return Response(serializer.data)
 
 
-class ContractViewSet(viewsets.ReadOnlyModelViewSet):
+class ContractViewSet(EagerLoadingMixin, viewsets.ReadOnlyModelViewSet):
     """ Read-only ViewSet for viewing contracts. """
-    # Optimized queryset
-    queryset = Contract.objects.all().select_related('project__client__profile', 'freelancer__profile').order_by('-start_date') # Added profile relations
+    queryset = Contract.objects.all().order_by('-start_date')
+    pagination_class = StartDateCursorPagination # Keyset pages, no COUNT(*)
+    # Columns rendered by ContractSerializer with the default project summary
+    read_columns = (
+        'id', 'agreed_rate', 'start_date', 'end_date', 'is_completed',
+        'project__id', 'project__title', 'project__status', 'project__budget',
+        'freelancer__id', 'freelancer__username', 'freelancer__email'
+    )
     serializer_class = ContractSerializer
     permission_classes = [permissions.IsAuthenticated] # Must be logged in
 
     def get_queryset(self):
         """ Filter contracts based on user role. """
         user = self.request.user
-        queryset = super().get_queryset() # Use optimized queryset from class
+        queryset = self.eager_load(super().get_queryset(), include=self.get_includes())
 
         if not user.is_authenticated:
             return Contract.objects.none()
 
-        profile = getattr(user, 'profile', None)
+        profile = get_request_profile(self.request)
         if profile:
              if profile.user_type == 'freelancer':
                  # Freelancer sees contracts where they are the freelancer
@@ -391,47 +586,52 @@ class ContractViewSet(viewsets.ReadOnlyModelViewSet):
 
         return Contract.objects.none()
 
+    def get_includes(self):
+        """ Parse the optional `?include=a,b` expansions requested by the client. """
+        return {name.strip() for name in self.request.query_params.get('include', '').split(',') if name.strip()}
+
+    def get_read_columns(self):
+        if 'project.skills' in self.get_includes(): # The full nested project needs every project column
+            return None
+        return self.read_columns
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include'] = self.get_includes()
+        return context
+
 
-class MessageViewSet(viewsets.ModelViewSet):
+class MessageViewSet(EagerLoadingMixin, StreamingListMixin, viewsets.ModelViewSet):
     """ ViewSet for sending and viewing messages. """
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated] # Must be logged in
+    pagination_class = TimestampCursorPagination # Newest messages first, keyset-paginated
+    # Columns rendered by MessageSerializer; the joined users contribute only their usernames
+    read_columns = (
+        'id', 'content', 'timestamp',
+        'sender__id', 'sender__username', 'receiver__id', 'receiver__username'
+    )
     # Prevent PUT requests (force update of all fields), allow PATCH if needed later
     http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
 
     def get_queryset(self):
-        """ Filter messages involving the current user, ordered chronologically. """
+        """ Filter messages involving the current user. """
         user = self.request.user
         if not user.is_authenticated:
             return Message.objects.none()
-        # Optimize query by selecting related sender and receiver profiles if needed elsewhere,
-        # but for basic display, just sender/receiver is fine.
-        return Message.objects.select_related('sender', 'receiver').filter(
-            Q(sender=user) | Q(receiver=user)
-        ).order_by('timestamp') # Ascending order for chat history
+        queryset = self.eager_load(Message.objects.all())
+        # Newest first, as TimestampCursorPagination orders the list (the frontend sorts each
+        # conversation itself); spelled out so ?export=1, which bypasses the paginator, matches
+        return queryset.filter(Q(sender=user) | Q(receiver=user)).order_by('-timestamp')
 
     # --- SIMPLIFIED perform_create ---
     def perform_create(self, serializer):
-        """ Set sender, find receiver by username, and save. """
-        receiver_username = serializer.validated_data.get('receiver_username')
+        """ Set sender and save; the serializer has already resolved the receiver. """
         sender = self.request.user
+        receiver = serializer.validated_data['receiver']
 
-        # Validation (most should be handled by serializer)
-        if not receiver_username:
-             raise ValidationError({"receiver_username": "This field is required."})
-
-        try:
-            receiver = User.objects.get(username=receiver_username)
-        except User.DoesNotExist:
-             raise ValidationError({"receiver_username": f"User '{receiver_username}' not found."})
-
-        if receiver == sender:
-             raise ValidationError({"receiver_username": "You cannot send messages to yourself."})
-
-        # Save the message instance - the serializer's overridden create method
-        # will handle removing 'receiver_username' before model creation.
-        # DRF automatically passes sender and receiver to the serializer's create method.
-        serializer.save(sender=sender, receiver=receiver)
+        # Save the message instance; 'receiver' is already in validated_data
+        serializer.save(sender=sender)
         logger.info(f"Message sent from {sender.username} to {receiver.username}")
         # No need for explicit try/except here for the TypeError anymore
         # Let DRF's default exception handling manage other potential errors (like DB errors)
@@ -441,10 +641,15 @@ class MessageViewSet(viewsets.ModelViewSet):
     # Add IsOwnerOrReadOnly to permission_classes and ensure it checks obj.sender for Message instances.
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     """ ViewSet for creating and viewing reviews. """
-    # Optimized queryset
-    queryset = Review.objects.all().select_related('project', 'reviewer__profile', 'reviewee__profile').order_by('-created_at') # Added profile relations
+    queryset = Review.objects.all().order_by('-created_at')
+    pagination_class = CreatedAtCursorPagination # Keyset pages, no COUNT(*)
+    # Columns rendered by ReviewSerializer; the joined rows contribute only a title and usernames
+    read_columns = (
+        'id', 'rating', 'comment', 'created_at', 'project__id', 'project__title',
+        'reviewer__id', 'reviewer__username', 'reviewee__id', 'reviewee__username'
+    )
     serializer_class = ReviewSerializer
     # Base permissions: Must be logged in. Owner check for modification.
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly] # Checks reviewer for edit/delete
@@ -454,22 +659,24 @@ class ReviewViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """ Filter reviews by project or user involvement. """
         user = self.request.user
-        queryset = super().get_queryset() # Use optimized queryset
+        queryset = self.eager_load(super().get_queryset())
         project_id = self.request.query_params.get('project')
 
         if project_id:
-            # If filtering by project, ensure the project exists first
-            project = get_object_or_404(Project, pk=project_id)
-
-            # Check if user is the client or the accepted freelancer for this project
-            is_client = project.client == user
-            is_accepted_freelancer = Contract.objects.filter(project=project, freelancer=user).exists()
-            # Alternative check using proposal status (less direct if contract exists):
-            # is_accepted_freelancer = project.proposals.filter(freelancer=user, status='accepted').exists()
+            # If filtering by project, fetch its owner id and whether the user holds its contract
+            # in one query (the contract is the record of the accepted freelancer)
+            try:
+                access = Project.objects.filter(pk=project_id).annotate(
+                    is_accepted_freelancer=Exists(Contract.objects.filter(project=OuterRef('pk'), freelancer_id=user.id))
+                ).values('id', 'client_id', 'is_accepted_freelancer').first()
+            except (TypeError, ValueError):
+                access = None
+            if access is None:
+                raise NotFound("No Project matches the given query.")
 
             # Allow view if user is staff, client, or the accepted freelancer
-            if user.is_staff or is_client or is_accepted_freelancer:
-                return queryset.filter(project=project)
+            if user.is_staff or access['client_id'] == user.id or access['is_accepted_freelancer']:
+                return queryset.filter(project_id=access['id'])
             else:
                  # Raise 403 Forbidden if user is not allowed to see reviews for this specific project
                 raise PermissionDenied("You do not have permission to view reviews for this project.")
@@ -481,11 +688,22 @@ class ReviewViewSet(viewsets.ModelViewSet):
             # Anonymous users see nothing without a project filter (which would fail anyway)
             return Review.objects.none()
 
+    def list(self, request, *args, **kwargs):
+        """ Paginated reviews plus a rating summary computed once for the whole filtered set. """
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(self.get_serializer(queryset, many=True).data)
+        response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+        # Single SQL aggregate instead of deriving averages per serialized row
+        response.data['rating_summary'] = queryset.aggregate(average=Avg('rating'), count=Count('id'))
+        return response
+
     def perform_create(self, serializer):
         """ Validate who can review whom for a specific project and save. """
         project = serializer.validated_data.get('project')
         user = self.request.user
-        profile = getattr(user, 'profile', None)
+        profile = get_request_profile(self.request)
 
         if not profile:
              raise PermissionDenied("User profile is required to submit reviews.")
@@ -494,55 +712,64 @@ class ReviewViewSet(viewsets.ModelViewSet):
         # if project.status not in ['completed', 'in_progress']:
         #      raise ValidationError("Reviews can only be submitted for in-progress or completed projects.")
 
+        # Resolve the reviewee with one SELECT per role; the contract join doubles as the
+        # authorization check, and only the columns rendered in the response are loaded
         reviewee = None
-        is_client_reviewing = False
-        is_freelancer_reviewing = False
-
-        # Determine reviewer's role in the project
-        if profile.user_type == 'client' and project.client == user:
-            is_client_reviewing = True
+        if profile.user_type == 'client' and project.client_id == user.id:
+            # Client reviews the freelancer associated with the (one-to-one) contract
+            reviewee = User.objects.only('id', 'username').filter(contract__project=project).first()
+            if reviewee is None:
+                 raise ValidationError("Cannot create review: No contract found for this project.")
         elif profile.user_type == 'freelancer':
-            # Check if this freelancer has a contract for this project
-            try:
-                contract = Contract.objects.get(project=project, freelancer=user)
-                is_freelancer_reviewing = True
-            except Contract.DoesNotExist:
-                 # If no contract, check if they had an accepted proposal (fallback, less reliable)
-                 # if project.proposals.filter(freelancer=user, status='accepted').exists():
-                 #      is_freelancer_reviewing = True
-                 # else:
+            # Freelancer reviews the client, but only if they hold this project's contract
+            reviewee = User.objects.only('id', 'username').filter(
+                pk=project.client_id, projects__contract__freelancer=user, projects__pk=project.pk
+            ).first()
+            if reviewee is None:
                  raise PermissionDenied("You are not the accepted freelancer for this project.")
-
-        # Determine the reviewee based on the reviewer's role
-        if is_client_reviewing:
-            try:
-                # Client reviews the freelancer associated with the contract
-                contract = Contract.objects.get(project=project) # Assuming one contract per project
-                reviewee = contract.freelancer
-            except Contract.DoesNotExist:
-                 raise ValidationError("Cannot create review: No contract found for this project.")
-        elif is_freelancer_reviewing:
-             # Freelancer reviews the client who posted the project
-             reviewee = project.client
         else:
-             # Should be caught earlier, but safety check
              raise PermissionDenied("You are neither the client nor the contracted freelancer for this project.")
 
         if not reviewee: # Should be caught above, but safety check
             raise ValidationError("Could not determine who to review.")
 
-        # Prevent duplicate reviews (reviewer -> reviewee for this project)
-        if Review.objects.filter(project=project, reviewer=user, reviewee=reviewee).exists():
+        # Save the review with reviewer and reviewee set. Duplicates are rejected by the
+        # uniq_review constraint; the savepoint keeps any outer transaction usable.
+        try:
+            with transaction.atomic():
+                serializer.save(reviewer=user, reviewee=reviewee)
+        except IntegrityError:
+             raise ValidationError("You have already reviewed this user for this project.")
+
+    def perform_update(self, serializer):
+        """ Save in a savepoint; moving a review onto a project already reviewed hits the constraint. """
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
              raise ValidationError("You have already reviewed this user for this project.")
 
-        # Save the review with reviewer and reviewee set
-        serializer.save(reviewer=user, reviewee=reviewee)
+
+def notification_list_etag(request, *args, **kwargs):
+    """ ETag for a user's notification feed: changes on new, deleted, read or unread notifications. """
+    # count/max id move on adds and deletes; every read flag change bumps updated_at
+    stats = Notification.objects.filter(recipient=request.user).aggregate(
+        count=Count('id'), max_id=Max('id'), changed=Max('updated_at')
+    )
+    changed = stats['changed'].timestamp() if stats['changed'] else 0
+    return f"notifications-{request.user.id}-{stats['count']}-{stats['max_id']}-{changed}"
 
 
-class NotificationViewSet(viewsets.ModelViewSet):
+# The UI polls the feed; an unchanged feed revalidates to a bodiless 304 without serializing
+@method_decorator(
+    [cache_control(private=True, no_cache=True), vary_on_headers('Authorization'), etag(notification_list_etag)],
+    name='list'
+)
+class NotificationViewSet(EagerLoadingMixin, StreamingListMixin, viewsets.ModelViewSet):
     """ ViewSet for user notifications with mark read/unread actions. """
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly] # Checks recipient
+    pagination_class = TimestampCursorPagination
     # Limit allowed methods: GET (list/detail), PATCH (actions), POST (mark all read), DELETE (optional)
     http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
 
@@ -551,40 +778,67 @@ class NotificationViewSet(viewsets.ModelViewSet):
         user = self.request.user
         if not user.is_authenticated:
             return Notification.objects.none()
+        if self.action == 'list':
+            # Flat rows: the list renders plain columns, so skip model instantiation
+            queryset = Notification.objects.values(*NotificationListSerializer.columns)
+        else:
+            queryset = self.eager_load(Notification.objects.all())
         # Order by most recent first
-        # Optimize by selecting related objects if needed by serializer (PKRelatedField is efficient)
-        return Notification.objects.filter(recipient=user).select_related(
-            'project', 'proposal', 'related_message' # Select related if using deeper serializers
-        ).order_by('-timestamp')
+        return queryset.filter(recipient=user).order_by('-timestamp')
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return NotificationListSerializer
+        return super().get_serializer_class()
 
     # Allow PATCH on detail view for individual read/unread
     @action(detail=True, methods=['patch'], url_path='mark-read')
     def mark_read(self, request, pk=None):
         """ Mark a specific notification as read. """
-        notification = self.get_object() # Permission check included (IsOwnerOrReadOnly)
-        if not notification.read:
-            notification.read = True
-            notification.save(update_fields=['read'])
-        serializer = self.get_serializer(notification)
-        return Response(serializer.data)
+        return self._set_read(request, pk, True)
 
     @action(detail=True, methods=['patch'], url_path='mark-unread')
     def mark_unread(self, request, pk=None):
         """ Mark a specific notification as unread. """
-        notification = self.get_object() # Permission check included
-        if notification.read:
-            notification.read = False
-            notification.save(update_fields=['read'])
-        serializer = self.get_serializer(notification)
-        return Response(serializer.data)
+        return self._set_read(request, pk, False)
+
+    def _set_read(self, request, pk, read):
+        """ Single UPDATE scoped to the recipient; no row is fetched first. """
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            raise NotFound("Notification not found.")
+        # Filtering on recipient enforces ownership in SQL (same 404 as get_object for others' rows);
+        # the read flag in the WHERE turns a repeat click into a no-op instead of a row write
+        notifications = Notification.objects.filter(pk=pk, recipient=request.user)
+        updated = notifications.filter(read=not read).update(read=read, updated_at=timezone.now())
+        if not updated and not notifications.exists():
+            raise NotFound("Notification not found.")
+        if updated:
+            invalidate_unread_count(request.user.id)
+        return Response({'id': pk, 'read': read})
 
     # Allow POST on list view for bulk action
     @action(detail=False, methods=['post'], url_path='mark-all-read')
     def mark_all_read(self, request):
         """ Mark all unread notifications for the user as read. """
         user = request.user
-        updated_count = Notification.objects.filter(recipient=user, read=False).update(read=True)
-        return Response({'status': f'{updated_count} notifications marked as read.'}, status=status.HTTP_200_OK)
-
-    # By default, ModelViewSet provides destroy. Permission restricts deletion to recipient.
-    # No custom perform_destroy needed unless extra logic is required.
\ No newline at end of file
+        updated_count = Notification.objects.filter(recipient=user, read=False).update(read=True, updated_at=timezone.now())
+        invalidate_unread_count(user.id)
+        return Response(
+            {'status': f'{updated_count} notifications marked as read.', 'updated': updated_count},
+            status=status.HTTP_200_OK
+        )
+
+    @action(detail=False, methods=['get'], url_path='unread-count')
+    def unread_count(self, request):
+        """ Number of unread notifications; cached per user for a short TTL and dropped on writes. """
+        user = request.user
+        count = cache.get_or_set(
+            unread_count_cache_key(user.id),
+            lambda: Notification.objects.filter(recipient=user, read=False).count(),
+            UNREAD_COUNT_CACHE_TIMEOUT
+        )
+        return Response({'unread_count': count})
+
+    # By default, ModelViewSet provides destroy. Permission restricts deletion to recipient.
\ No newline at end of file
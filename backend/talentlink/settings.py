@@ -65,8 +65,15 @@ CORS_ALLOWED_ORIGINS = [
 # Configure DRF to use JWT
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'api.authentication.ProfileJWTAuthentication', # JWT auth with the profile joined in
+    ),
+    # Bound every list endpoint; feeds override this with cursor pagination
+    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'PAGE_SIZE': 50,
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.OrjsonRenderer', # Falls back to the stdlib encoder if orjson is missing
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
 
@@ -148,3 +155,21 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 DEFAULT_FROM_EMAIL = 'noreply@talentlink.example.com'
+
+# Route the api app's log records (notification emails, view errors) through logging
+# instead of print(); records below WARNING are dropped unless DEBUG is on.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api': {
+            'handlers': ['console'],
+            'level': 'INFO' if DEBUG else 'WARNING',
+        },
+    },
+}